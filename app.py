@@ -1,7 +1,7 @@
 from flask import Flask, render_template, session, request, jsonify
 from argparse import ArgumentParser
 from blockchain import Blockchain, Transaction
-from users import initialize_users, get_user, get_users_by_role, create_and_sign_transaction, verify_transaction, ROLES
+from users import initialize_users, get_user, get_users_by_role, create_and_sign_transaction, verify_transaction, verify_transactions, ROLES
 import secrets
 
 
@@ -20,6 +20,13 @@ AVAILABLE_ROLES = list(ROLES.keys())
 def mine_transaction(transaction):
     """Helper to add transaction and mine block immediately"""
     blockchain.add_transaction(transaction)
+    
+    # Verify the whole pending pool in one pass before it goes into a block
+    invalid = verify_transactions(blockchain.transactions)
+    if invalid:
+        blockchain.transactions = [tx for tx in blockchain.transactions if tx not in invalid]
+        raise ValueError(f"Rejected {len(invalid)} invalid transaction(s)")
+    
     last_block = blockchain.get_last_block()
     blockchain.create_block(nonce=1, previous_hash=last_block.hash)
 
@@ -122,7 +129,8 @@ def api_get_stats():
         'total_blocks': len(blockchain.chain),
         'total_vehicles': len(blockchain.vin_index),
         'pending_transactions': len(blockchain.transactions),
-        'chain_valid': blockchain.is_chain_valid()
+        # Stats are polled often, so only check blocks added since the last validation
+        'chain_valid': blockchain.is_chain_valid(from_checkpoint=True)
     })
 
 @app.route('/api/chain', methods=['GET'])
@@ -1,7 +1,51 @@
-from time import time
+from time import time_ns
+import sys
+import copy
 import json
 import hashlib
+from bisect import insort
 from collections import defaultdict
+from operator import attrgetter
+
+
+#Encoder for transaction payloads when hashing
+#Built once: json.dumps with non-default options constructs a new encoder per call
+_PAYLOAD_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+
+#Pack fields into bytes in a fixed order for hashing
+#Each field is length-prefixed so different field values can't produce the same bytes
+#Integers (timestamps, block numbers, nonces) are packed as 8-byte big-endian
+def _pack_fields(*fields):
+    parts = []
+    for field in fields:
+        if field is None:
+            parts.append(b'\xff\xff\xff\xff')
+            continue
+        if isinstance(field, int):
+            field = field.to_bytes(8, 'big', signed=True)
+        elif not isinstance(field, bytes):
+            field = str(field).encode('utf8')
+        parts.append(len(field).to_bytes(4, 'big'))
+        parts.append(field)
+    return b''.join(parts)
+
+
+#Root of a binary Merkle tree over raw leaf digests
+#An odd node at the end of a level is paired with itself
+def _merkle_root(leaves):
+    if not leaves:
+        return '0' * 64
+    
+    level = leaves
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [
+            hashlib.sha256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level), 2)
+        ]
+    return level[0].hex()
 
 
 class Transaction:
@@ -12,12 +56,16 @@ class Transaction:
     This is primarily a data object. Signing is handled using functions from other modules
     """
     
+    __slots__ = ('vin', 'type', 'actor_id', 'role', 'timestamp', 'payload', 'tx_id', 'signature')
+    
     def __init__(self, vin, tx_type, actor_id, role, payload):
         self.vin = vin
-        self.type = tx_type
-        self.actor_id = actor_id
-        self.role = role
-        self.timestamp = time()
+        # Only a handful of distinct types, roles and actors exist, so intern them:
+        # objects share one string each and equality checks hit the identity fast path
+        self.type = sys.intern(tx_type)
+        self.actor_id = sys.intern(actor_id)
+        self.role = sys.intern(role)
+        self.timestamp = time_ns()
         self.payload = payload
         self.tx_id = None
         self.signature = None
@@ -35,66 +83,115 @@ class Transaction:
             'role': self.role,
             'timestamp': self.timestamp,
             'payload': self.payload,
-            'signature': self.signature
+            'signature': self.signature.hex() if self.signature else None
         }
     
+    #Canonical bytes of the transaction data (without tx_id and signature)
+    #Only the payload still goes through JSON, since it is free-form
+    def _canonical_bytes(self):
+        return _pack_fields(
+            self.vin,
+            self.type,
+            self.actor_id,
+            self.role,
+            self.timestamp,
+            _PAYLOAD_ENCODER.encode(self.payload)
+        )
+    
     #Compute SHA256 hash of transaction data (without signature)
     def _compute_tx_id(self):
-        tx_data = {
-            'vin': self.vin,
-            'type': self.type,
-            'actor_id': self.actor_id,
-            'role': self.role,
-            'timestamp': self.timestamp,
-            'payload': self.payload
-        }
-        tx_string = json.dumps(tx_data, sort_keys=True).encode('utf8')
-        h = hashlib.sha256()
-        h.update(tx_string)
-        return h.hexdigest()
+        return hashlib.sha256(self._canonical_bytes()).hexdigest()
+    
+    #Merkle leaf: covers the transaction data, the stored tx_id and the signature
+    #so tampering with any of them changes the block's merkle root
+    #Hashes the canonical bytes directly rather than re-hashing the recomputed tx_id
+    def _leaf_hash(self):
+        h = hashlib.sha256(self._canonical_bytes())
+        h.update(_pack_fields(self.tx_id, self.signature))
+        return h.digest()
     
     #Create transaction object from dictionary
+    #Bypasses __init__ so the stored tx_id is reused instead of re-hashing
     @classmethod
     def from_dict(cls, tx_dict):
         
-        tx = cls(
-            vin=tx_dict['vin'],
-            tx_type=tx_dict['type'],
-            actor_id=tx_dict['actor_id'],
-            role=tx_dict['role'],
-            payload=tx_dict['payload']
-        )
-        tx.timestamp = tx_dict['timestamp']
-        tx.tx_id = tx_dict.get('tx_id')
-        tx.signature = tx_dict.get('signature')
+        tx = cls.__new__(cls)
+        tx.vin = tx_dict['vin']
+        tx.type = sys.intern(tx_dict['type'])
+        tx.actor_id = sys.intern(tx_dict['actor_id'])
+        tx.role = sys.intern(tx_dict['role'])
+        tx.timestamp = int(tx_dict['timestamp'])
+        tx.payload = tx_dict['payload']
+        tx.signature = bytes.fromhex(tx_dict['signature']) if tx_dict.get('signature') else None
+        tx.tx_id = tx_dict.get('tx_id') or tx._compute_tx_id()
         return tx
 
 
 #class representing a block in the blockchain
 class Block:
     
+    __slots__ = (
+        'block_number', 'timestamp', 'transactions', 'previous_hash',
+        'nonce', 'merkle_root', 'hash', '_merkle_cache'
+    )
+    
     def __init__(self, block_number, transactions, previous_hash, nonce=0):
         self.block_number = block_number
-        self.timestamp = time()
+        self.timestamp = time_ns()
         self.transactions = transactions
         self.previous_hash = previous_hash
         self.nonce = nonce
+        self.merkle_root = None
         self.hash = None
+        
+        # (leaves, root) from the last merkle computation
+        self._merkle_cache = None
     
-    def compute_hash(self):
-
-        block_dict = {
-            'block_number': self.block_number,
-            'timestamp': self.timestamp,
-            'transactions': [tx.to_dict() for tx in self.transactions],
-            'nonce': self.nonce,
-            'previous_hash': self.previous_hash
-        }
-        block_string = json.dumps(block_dict, sort_keys=True).encode('utf8')
-        h = hashlib.sha256()
-        h.update(block_string)
+    #Leaves are always recomputed, but the tree above them is only
+    #rebuilt when they differ from the cached leaf layer
+    def compute_merkle_root(self):
+        leaves = [tx._leaf_hash() for tx in self.transactions]
+        
+        if self._merkle_cache is not None and self._merkle_cache[0] == leaves:
+            return self._merkle_cache[1]
+        
+        root = _merkle_root(leaves)
+        self._merkle_cache = (leaves, root)
+        return root
+    
+    #SHA256 state over every header field except the nonce
+    #Transactions are covered through merkle_root
+    def _prefix_hash(self):
+        
+        return hashlib.sha256(_pack_fields(
+            self.block_number,
+            self.timestamp,
+            self.previous_hash,
+            len(self.transactions),
+            self.merkle_root
+        ))
+    
+    #nonce can be overridden to try candidates without touching the block
+    def compute_hash(self, nonce=None):
+        
+        if nonce is None:
+            nonce = self.nonce
+        
+        h = self._prefix_hash()
+        h.update(str(nonce).encode('utf8'))
         return h.hexdigest()
     
+    #Hash several nonce candidates, absorbing the prefix only once
+    def compute_hashes(self, nonces):
+        
+        prefix = self._prefix_hash()
+        hashes = []
+        for nonce in nonces:
+            h = prefix.copy()
+            h.update(str(nonce).encode('utf8'))
+            hashes.append(h.hexdigest())
+        return hashes
+    
     def to_dict(self):
         return {
             'block_number': self.block_number,
@@ -102,10 +199,22 @@ class Block:
             'transactions': [tx.to_dict() for tx in self.transactions],
             'nonce': self.nonce,
             'previous_hash': self.previous_hash,
+            'merkle_root': self.merkle_root,
             'hash': self.hash
         }
 
 
+#Genesis block, hashed once at import and copied into every new Blockchain
+def _make_genesis_block():
+    block = Block(block_number=1, transactions=[], previous_hash='00', nonce=0)
+    block.merkle_root = block.compute_merkle_root()
+    block.hash = block.compute_hash()
+    return block
+
+
+_GENESIS_BLOCK = _make_genesis_block()
+
+
 """
 Vehicle Passport Blockchain
 Manages the chain of blocks and transaction validation
@@ -121,8 +230,18 @@ class Blockchain:
         # VIN Index: dict mapping VIN -> list of transactions
         self.vin_index = defaultdict(list)
         
-        # Create genesis block
-        self.create_block(nonce=0, previous_hash='00')
+        # VIN summaries: dict mapping VIN -> vehicle info, updated as transactions are indexed
+        self.vin_summary = {}
+        # VIN -> latest recorded mileage (only set by records that carry one)
+        self._latest_mileage = {}
+        
+        # Start from a copy of the precomputed genesis block
+        genesis = copy.copy(_GENESIS_BLOCK)
+        genesis.transactions = []
+        self.chain.append(genesis)
+        
+        # (index, hash) of the last block covered by a successful validation
+        self._checkpoint = (0, genesis.hash)
     
     #Add a block of transactions to the blockchain
     def create_block(self, nonce, previous_hash):
@@ -134,6 +253,7 @@ class Blockchain:
             nonce=nonce
         )
         
+        block.merkle_root = block.compute_merkle_root()
         block.hash = block.compute_hash()
         
         self._index_block(block)
@@ -153,21 +273,42 @@ class Blockchain:
     
     #checks if the blockchain is valid
     #1. Block hashes are correct
-    #2. Block links are correct (previous_hash matches)
-    def is_chain_valid(self):
-    
-        for i in range(1, len(self.chain)):
+    #2. Merkle roots match the block's transactions
+    #3. Block links are correct (previous_hash matches)
+    #from_checkpoint only checks blocks added since the last successful validation,
+    #trusting earlier blocks not to have been modified in place
+    def is_chain_valid(self, from_checkpoint=False):
+        
+        start = 1
+        if from_checkpoint:
+            index, block_hash = self._checkpoint
+            # Only trust the checkpoint if that block is still in place
+            if index < len(self.chain) and self.chain[index].hash == block_hash:
+                start = index + 1
+        
+        # Check all links first: comparing the two hash lists runs in C,
+        # and a broken link fails fast without re-hashing any block
+        previous_hashes = [block.previous_hash for block in self.chain[start:]]
+        block_hashes = [block.hash for block in self.chain[start - 1:-1]]
+        
+        if previous_hashes != block_hashes:
+            for i, (previous_hash, block_hash) in enumerate(zip(previous_hashes, block_hashes), start):
+                if previous_hash != block_hash:
+                    print(f"Block {i} previous_hash doesn't match")
+                    return False
+        
+        for i in range(start, len(self.chain)):
             current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
             
             if current_block.hash != current_block.compute_hash():
                 print(f"Block {i} hash is invalid")
                 return False
             
-            if current_block.previous_hash != previous_block.hash:
-                print(f"Block {i} previous_hash doesn't match")
+            if current_block.merkle_root != current_block.compute_merkle_root():
+                print(f"Block {i} merkle root doesn't match its transactions")
                 return False
         
+        self._checkpoint = (len(self.chain) - 1, self.chain[-1].hash)
         return True
     
     def get_chain_data(self):
@@ -175,9 +316,62 @@ class Blockchain:
     
     # VIN indexing methods
     
+    #Keeps each VIN's list ordered by timestamp
+    #Transactions normally arrive in time order, so this is an append
     def _index_transaction(self, transaction):
-      
-        self.vin_index[transaction.vin].append(transaction)
+        
+        vin = transaction.vin
+        transactions = self.vin_index[vin]
+        
+        if transactions and transactions[-1].timestamp > transaction.timestamp:
+            insort(transactions, transaction, key=attrgetter('timestamp'))
+            
+            # The summary depends on order, so replay the whole history
+            del self.vin_summary[vin]
+            self._latest_mileage.pop(vin, None)
+            for tx in transactions:
+                self._update_summary(tx)
+        else:
+            transactions.append(transaction)
+            self._update_summary(transaction)
+    
+    #Apply one transaction, in history order, to its VIN's summary
+    def _update_summary(self, tx):
+        
+        info = self.vin_summary.get(tx.vin)
+        if info is None:
+            info = self.vin_summary[tx.vin] = {
+                'vin': tx.vin,
+                'make': None,
+                'model': None,
+                'year': None,
+                'current_owner': None,
+                'latest_mileage': None,
+                'created_by': None,
+                'created_at': None,
+                'total_transactions': 0
+            }
+        
+        info['total_transactions'] += 1
+        
+        if tx.type == 'VEHICLE_CREATED':
+            info['make'] = tx.payload.get('make')
+            info['model'] = tx.payload.get('model')
+            info['year'] = tx.payload.get('year')
+            info['latest_mileage'] = tx.payload.get('initial_mileage')
+            info['current_owner'] = tx.payload.get('owner_id', tx.actor_id)
+            info['created_by'] = tx.actor_id
+            info['created_at'] = tx.timestamp
+            if 'initial_mileage' in tx.payload:
+                self._latest_mileage[tx.vin] = tx.payload['initial_mileage']
+        
+        elif tx.type == 'MILEAGE_UPDATE':
+            info['latest_mileage'] = tx.payload.get('new_mileage')
+            if 'new_mileage' in tx.payload:
+                self._latest_mileage[tx.vin] = tx.payload['new_mileage']
+        
+        elif tx.type == 'OWNERSHIP_TRANSFER':
+            info['current_owner'] = tx.payload.get('new_owner_id')
     
     def _index_block(self, block):
     
@@ -186,60 +380,22 @@ class Blockchain:
     
     def get_vehicle_history(self, vin):
 
-        transactions = self.vin_index.get(vin, [])
-        return sorted(transactions, key=lambda tx: tx.timestamp)
+        # vin_index is already sorted by timestamp
+        return list(self.vin_index.get(vin, []))
     
     def get_vehicle_info(self, vin):
         
-        history = self.get_vehicle_history(vin)
+        info = self.vin_summary.get(vin)
         
-        if not history:
+        if info is None:
             return None
         
-        info = {
-            'vin': vin,
-            'make': None,
-            'model': None,
-            'year': None,
-            'current_owner': None,
-            'latest_mileage': None,
-            'created_by': None,
-            'created_at': None,
-            'total_transactions': len(history)
-        }
-        
-        # Extract information from transaction history
-        for tx in history:
-            if tx.type == 'VEHICLE_CREATED':
-                info['make'] = tx.payload.get('make')
-                info['model'] = tx.payload.get('model')
-                info['year'] = tx.payload.get('year')
-                info['latest_mileage'] = tx.payload.get('initial_mileage')
-                info['current_owner'] = tx.payload.get('owner_id', tx.actor_id)
-                info['created_by'] = tx.actor_id
-                info['created_at'] = tx.timestamp
-            
-            elif tx.type == 'MILEAGE_UPDATE':
-                info['latest_mileage'] = tx.payload.get('new_mileage')
-            
-            elif tx.type == 'OWNERSHIP_TRANSFER':
-                info['current_owner'] = tx.payload.get('new_owner_id')
-        
-        return info
+        # Copy so callers can't modify the cached summary
+        return dict(info)
     
     def get_latest_mileage(self, vin):
         
-        history = self.get_vehicle_history(vin)
-        
-        mileage = None
-        
-        for tx in history:
-            if tx.type == 'VEHICLE_CREATED' and 'initial_mileage' in tx.payload:
-                mileage = tx.payload['initial_mileage']
-            elif tx.type == 'MILEAGE_UPDATE' and 'new_mileage' in tx.payload:
-                mileage = tx.payload['new_mileage']
-        
-        return mileage
+        return self._latest_mileage.get(vin)
     
     def vehicle_exists(self, vin):
         
@@ -247,8 +403,19 @@ class Blockchain:
     
     def rebuild_index_from_chain(self):
         self.vin_index = defaultdict(list)
+        self.vin_summary = {}
+        self._latest_mileage = {}
+        self._checkpoint = (0, self.chain[0].hash)
         
+        # Group everything first and sort each VIN once, rather than
+        # placing and re-summarising transactions one at a time
         for block in self.chain:
-            self._index_block(block)
+            for transaction in block.transactions:
+                self.vin_index[transaction.vin].append(transaction)
+        
+        for transactions in self.vin_index.values():
+            transactions.sort(key=attrgetter('timestamp'))
+            for transaction in transactions:
+                self._update_summary(transaction)
         
         return len(self.vin_index)
\ No newline at end of file
@@ -3,47 +3,50 @@ Cryptographic utilities for transaction signing and verification
 Separates signing logic from Transaction data objects
 """
 
-import binascii
-from Crypto.PublicKey import RSA
-from Crypto.Signature import PKCS1_v1_5
-from Crypto.Hash import SHA256
-from Crypto.Random import new
+from Crypto.PublicKey import ECC
+from Crypto.Signature import eddsa
 
-# sign a transaction with a private key
+# Keys and signatures are raw bytes (keys as DER)
+# hex encoding only happens at the API boundary (to_dict)
+
+# Parsing a DER key costs more than a signature, so callers build
+# a signer/verifier once per key and reuse it
+def new_signer(private_key_der):
+    return eddsa.new(ECC.import_key(private_key_der), 'rfc8032')
+
+
+def new_verifier(public_key_der):
+    return eddsa.new(ECC.import_key(public_key_der), 'rfc8032')
+
+
+# sign a transaction with a signer from new_signer
 # no return modifies in place
-def sign_transaction(transaction, private_key_hex):
+def sign_transaction(transaction, signer):
     if not transaction.tx_id:
         raise ValueError("Transaction must have tx_id before signing")
     
-    private_key = RSA.importKey(binascii.unhexlify(private_key_hex))
-    signer = PKCS1_v1_5.new(private_key)
-    h = SHA256.new(transaction.tx_id.encode('utf8'))
-    signature = binascii.hexlify(signer.sign(h)).decode('ascii')
-    
-    transaction.signature = signature
+    transaction.signature = signer.sign(transaction.tx_id.encode('utf8'))
 
 
-def verify_transaction_signature(transaction, public_key_hex):
+def verify_transaction_signature(transaction, verifier):
     if not transaction.signature or not transaction.tx_id:
         return False
     
     #try except block to catch unexpected errors and return False instead of crashing
+    #eddsa raises ValueError when the signature doesn't match
     try:
-        public_key = RSA.importKey(binascii.unhexlify(public_key_hex))
-        verifier = PKCS1_v1_5.new(public_key)
-        h = SHA256.new(transaction.tx_id.encode('utf8'))
-        return verifier.verify(h, binascii.unhexlify(transaction.signature))
+        verifier.verify(transaction.tx_id.encode('utf8'), transaction.signature)
+        return True
     except (ValueError, TypeError):
         return False
 
 
 def generate_keypair():
 
-    random_gen = new().read
-    private_key = RSA.generate(1024, random_gen)
-    public_key = private_key.publickey()
+    private_key = ECC.generate(curve='Ed25519')
+    public_key = private_key.public_key()
     
-    private_key_hex = binascii.hexlify(private_key.export_key(format='DER')).decode('ascii')
-    public_key_hex = binascii.hexlify(public_key.export_key(format='DER')).decode('ascii')
+    private_key_der = private_key.export_key(format='DER')
+    public_key_der = public_key.export_key(format='DER')
     
-    return private_key_hex, public_key_hex
\ No newline at end of file
+    return private_key_der, public_key_der
\ No newline at end of file
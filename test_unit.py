@@ -11,6 +11,12 @@ class TestBlockchainLogic(unittest.TestCase):
     def test_genesis_block(self):
         self.assertEqual(len(self.bc.chain), 1)
         self.assertEqual(self.bc.chain[0].previous_hash, '00')
+        self.assertEqual(self.bc.chain[0].hash, self.bc.chain[0].compute_hash())
+        
+        # each chain gets its own copy of the shared genesis block
+        other = Blockchain()
+        self.assertEqual(other.chain[0].hash, self.bc.chain[0].hash)
+        self.assertIsNot(other.chain[0], self.bc.chain[0])
 
     def test_transaction_creation(self):
         # test transaction
@@ -24,6 +30,18 @@ class TestBlockchainLogic(unittest.TestCase):
         self.assertIsNotNone(tx.tx_id)
         self.assertEqual(tx.vin, "TEST-VIN")
 
+    def test_transaction_from_dict(self):
+        tx = Transaction("V1", "VEHICLE_CREATED", "u1", "MANUFACTURER", {"year": 2022})
+        tx.signature = b"\xab\xcd"
+        
+        restored = Transaction.from_dict(tx.to_dict())
+        self.assertEqual(restored.to_dict(), tx.to_dict())
+        
+        # missing tx_id is recomputed from the stored fields
+        tx_dict = tx.to_dict()
+        del tx_dict['tx_id']
+        self.assertEqual(Transaction.from_dict(tx_dict).tx_id, tx.tx_id)
+
     #testing instant mining
     def test_block_mining(self):
         
@@ -42,6 +60,81 @@ class TestBlockchainLogic(unittest.TestCase):
         self.assertEqual(len(self.bc.transactions), 0) # Pool should be empty
         self.assertEqual(self.bc.chain[1].previous_hash, last_hash)
 
+    def test_block_nonce_hashes(self):
+        block = self.bc.get_last_block()
+        
+        hashes = block.compute_hashes([0, 1, 2])
+        self.assertEqual(hashes[0], block.compute_hash())
+        self.assertEqual(hashes[1], block.compute_hash(nonce=1))
+        self.assertEqual(len(set(hashes)), 3)
+
+    def test_merkle_root(self):
+        for count in range(1, 6):
+            bc = Blockchain()
+            for n in range(count):
+                bc.add_transaction(Transaction(f"V{n}", "TEST", "u1", "role", {}))
+            block = bc.create_block(nonce=1, previous_hash=bc.get_last_block().hash)
+            
+            self.assertEqual(block.merkle_root, block.compute_merkle_root())
+            self.assertTrue(bc.is_chain_valid())
+            
+            # changing any transaction changes the root
+            block.transactions[-1].signature = b"forged"
+            self.assertNotEqual(block.merkle_root, block.compute_merkle_root())
+            self.assertFalse(bc.is_chain_valid())
+
+    def test_latest_mileage(self):
+        self.assertIsNone(self.bc.get_latest_mileage("V1"))
+        
+        self.bc.add_transaction(Transaction("V1", "VEHICLE_CREATED", "u1", "MANUFACTURER", {"initial_mileage": 100}))
+        self.bc.add_transaction(Transaction("V1", "MILEAGE_UPDATE", "u2", "MECHANIC", {"new_mileage": 500}))
+        self.bc.add_transaction(Transaction("V1", "SERVICE_RECORD", "u2", "MECHANIC", {"service_type": "Oil"}))
+        self.bc.create_block(nonce=1, previous_hash=self.bc.get_last_block().hash)
+        
+        self.assertEqual(self.bc.get_latest_mileage("V1"), 500)
+        self.assertEqual(self.bc.get_vehicle_info("V1")['latest_mileage'], 500)
+
+    def test_history_order(self):
+        first = Transaction("V1", "VEHICLE_CREATED", "u1", "MANUFACTURER", {})
+        second = Transaction("V1", "SERVICE_RECORD", "u2", "MECHANIC", {})
+        late = Transaction("V1", "SERVICE_RECORD", "u2", "MECHANIC", {})
+        late.timestamp = first.timestamp - 1
+        
+        for tx in (first, second, late):
+            self.bc.add_transaction(tx)
+        self.bc.create_block(nonce=1, previous_hash=self.bc.get_last_block().hash)
+        
+        self.assertEqual(self.bc.get_vehicle_history("V1"), [late, first, second])
+        self.assertEqual(self.bc.get_vehicle_info("V1")['total_transactions'], 3)
+        self.assertEqual(self.bc.get_vehicle_info("V1")['created_by'], "u1")
+        
+        info = self.bc.get_vehicle_info("V1")
+        self.assertEqual(self.bc.rebuild_index_from_chain(), 1)
+        self.assertEqual(self.bc.get_vehicle_history("V1"), [late, first, second])
+        self.assertEqual(self.bc.get_vehicle_info("V1"), info)
+
+    def test_vehicle_info(self):
+        self.assertIsNone(self.bc.get_vehicle_info("V1"))
+        
+        created = Transaction("V1", "VEHICLE_CREATED", "u1", "MANUFACTURER",
+                              {"make": "Make", "model": "Model", "year": 2020, "initial_mileage": 10})
+        transfer = Transaction("V1", "OWNERSHIP_TRANSFER", "u1", "MANUFACTURER", {"new_owner_id": "b1"})
+        self.bc.add_transaction(created)
+        self.bc.add_transaction(transfer)
+        self.bc.create_block(nonce=1, previous_hash=self.bc.get_last_block().hash)
+        
+        info = self.bc.get_vehicle_info("V1")
+        self.assertEqual(info['make'], "Make")
+        self.assertEqual(info['current_owner'], "b1")
+        self.assertEqual(info['latest_mileage'], 10)
+        self.assertEqual(info['created_at'], created.timestamp)
+        self.assertEqual(info['total_transactions'], 2)
+        
+        # rebuilding from the chain gives the same summary
+        self.bc.rebuild_index_from_chain()
+        self.assertEqual(self.bc.get_vehicle_info("V1"), info)
+        self.assertEqual(self.bc.get_latest_mileage("V1"), 10)
+
     def test_chain_validity(self):
         
         # Add a valid block
@@ -59,6 +152,38 @@ class TestBlockchainLogic(unittest.TestCase):
         # Should now be invalid because hash won't match data
         self.assertFalse(self.bc.is_chain_valid())
 
+    def test_checkpoint_validation(self):
+        for n in range(3):
+            self.bc.add_transaction(Transaction(f"V{n}", "TEST", "u1", "role", {}))
+            self.bc.create_block(nonce=1, previous_hash=self.bc.get_last_block().hash)
+        self.assertTrue(self.bc.is_chain_valid())
+        
+        # blocks added after the checkpoint are still checked
+        self.bc.add_transaction(Transaction("V4", "TEST", "u1", "role", {}))
+        self.bc.create_block(nonce=1, previous_hash='00')
+        self.assertFalse(self.bc.is_chain_valid(from_checkpoint=True))
+        self.bc.chain.pop()
+        
+        # blocks before the checkpoint are trusted, a full validation still catches edits
+        self.bc.chain[1].transactions[0].vin = "HACKED-VIN"
+        self.assertTrue(self.bc.is_chain_valid(from_checkpoint=True))
+        self.assertFalse(self.bc.is_chain_valid())
+        
+        # rebuilding the index resets the checkpoint
+        self.bc.rebuild_index_from_chain()
+        self.assertFalse(self.bc.is_chain_valid(from_checkpoint=True))
+
+    def test_broken_link(self):
+        for _ in range(3):
+            self.bc.create_block(nonce=1, previous_hash=self.bc.get_last_block().hash)
+        self.assertTrue(self.bc.is_chain_valid())
+        
+        # relink a block and re-hash it so only the link is wrong
+        block = self.bc.chain[2]
+        block.previous_hash = '00'
+        block.hash = block.compute_hash()
+        self.assertFalse(self.bc.is_chain_valid())
+
 if __name__ == '__main__':
     unittest.main(exit=False)
     input("Press Enter to close...")
\ No newline at end of file
@@ -2,22 +2,28 @@
 '''
 This module defines users, permissions
 '''
-from crypto_utils import generate_keypair, sign_transaction, verify_transaction_signature
+from crypto_utils import generate_keypair, new_signer, new_verifier, sign_transaction, verify_transaction_signature
 
 
 class User:
     
+    __slots__ = ('user_id', 'role', 'private_key', 'public_key', '_signer', '_verifier')
+    
     def __init__(self, user_id, role, private_key, public_key):
         self.user_id = user_id
         self.role = role
         self.private_key = private_key
         self.public_key = public_key
+        
+        # Keys are parsed once here instead of on every sign/verify
+        self._signer = new_signer(private_key)
+        self._verifier = new_verifier(public_key)
     
     def to_dict(self):
         return {
             'user_id': self.user_id,
             'role': self.role,
-            'public_key': self.public_key
+            'public_key': self.public_key.hex()
         }
 
 
@@ -114,7 +120,7 @@ def create_and_sign_transaction(user_id, vin, tx_type, payload):
     )
     
     # Sign transaction
-    sign_transaction(transaction, user.private_key)
+    sign_transaction(transaction, user._signer)
     
     return transaction
 
@@ -126,11 +132,17 @@ def verify_transaction(transaction):
         return False
     
     # Verify signature
-    if not verify_transaction_signature(transaction, user.public_key):
+    if not verify_transaction_signature(transaction, user._verifier):
         return False
     
     # Verify permissions
     if not can_user_create_transaction(transaction.actor_id, transaction.type):
         return False
     
-    return True
\ No newline at end of file
+    return True
+
+
+# Verify a batch of transactions, e.g. the pending pool before mining
+# Returns the transactions that failed verification
+def verify_transactions(transactions):
+    return [transaction for transaction in transactions if not verify_transaction(transaction)]
\ No newline at end of file